@@ -26,6 +26,8 @@ COINGECKO_OHLC_COLUMNS = {
     "close": {"data_type": "decimal"},
 }
 
+RPC_URL = os.getenv("RPC_URL")
+
 ETHERSCAN_LOG_COLUMNS = {
     "topics": {"data_type": "json"},
 }
@@ -0,0 +1,232 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+import duckdb
+import pyarrow as pa
+from defi_ds.config import *
+
+
+class DuckDBReader:
+    """
+    Read-only access to a DuckDB database loaded by the dlt pipelines.
+
+    DuckDB allows one writer or many readers per file, so the file is only held for the
+    length of each query: every query leases its own read-only connection, at most
+    pool_size at once, and closes it afterwards. A dlt load can run between queries, and
+    queries retry while a load holds the file, in another process or in this one. Results are Arrow tables, cached until
+    a new dlt load of the dataset completes, so repeated reads cost one load id lookup.
+
+    Args:
+        path: Path to the DuckDB file, e.g. 'data/prices.duckdb'
+        pool_size: Maximum number of concurrent connections
+        cache_size: Number of query results to keep
+        timeout: Seconds to wait for the write lock to be released
+    """
+
+    def __init__(
+        self,
+        path: str,
+        pool_size: int = 4,
+        cache_size: int = 128,
+        timeout: float = 60,
+    ):
+        self.path = str(path)
+        self.pool_size = pool_size
+        self.cache_size = cache_size
+        self.timeout = timeout
+
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._lock = threading.Lock()
+        self._cache: OrderedDict = OrderedDict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _connect(self) -> duckdb.DuckDBPyConnection:
+        deadline = time.monotonic() + self.timeout
+        delay = 0.1
+        while True:
+            try:
+                return duckdb.connect(self.path, read_only=True)
+            except (duckdb.IOException, duckdb.ConnectionException):
+                # Locked by a writer in another process, or open for writing in this one,
+                # e.g. by a dlt pipeline, until its connection is closed
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(delay)
+                delay = min(delay * 2, 5)
+
+    @contextmanager
+    def connection(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        """Lease a read-only connection, closed when the block exits."""
+        with self._slots:
+            connection = self._connect()
+            try:
+                yield connection
+            finally:
+                connection.close()
+
+    def close(self):
+        """Drop the cached results."""
+        with self._lock:
+            self._cache.clear()
+
+    @staticmethod
+    def _latest_load_id(
+        connection: duckdb.DuckDBPyConnection, dataset: str
+    ) -> Optional[str]:
+        return connection.execute(
+            f'SELECT max(load_id) FROM "{dataset}"._dlt_loads WHERE status = 0'
+        ).fetchone()[0]
+
+    def latest_load_id(self, dataset: str) -> Optional[str]:
+        """Latest completed dlt load of the dataset."""
+        with self.connection() as connection:
+            return self._latest_load_id(connection, dataset)
+
+    def query(
+        self,
+        sql: str,
+        params: Optional[Sequence[Any]] = None,
+        dataset: Optional[str] = None,
+    ) -> pa.Table:
+        """
+        Run a query and return the result as an Arrow table.
+
+        Args:
+            sql: SQL query, with ? placeholders
+            params: Query parameters
+            dataset: dlt dataset the query reads, caches the result until its next load
+
+        Returns:
+            Arrow table
+        """
+        params = tuple(params or ())
+        key = (sql, params)
+
+        with self.connection() as connection:
+            if dataset is None:
+                return connection.execute(sql, params).fetch_arrow_table()
+
+            load_id = self._latest_load_id(connection, dataset)
+            with self._lock:
+                cached = self._cache.get(key)
+                if cached is not None and cached[0] == load_id:
+                    self._cache.move_to_end(key)
+                    return cached[1]
+
+            table = connection.execute(sql, params).fetch_arrow_table()
+
+        with self._lock:
+            self._cache[key] = (load_id, table)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return table
+
+    def columns(self, dataset: str, table: str) -> List[str]:
+        """Columns of a table, without the dlt columns."""
+        result = self.query(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_schema = ? AND table_name = ? ORDER BY ordinal_position",
+            (dataset, table),
+            dataset=dataset,
+        )
+        return [
+            column
+            for column in result.column("column_name").to_pylist()
+            if not column.startswith("_dlt")
+        ]
+
+    def _select(
+        self,
+        dataset: str,
+        table: str,
+        columns: Optional[Sequence[str]],
+        filters: List[Tuple[str, Any]],
+        order_by: str,
+    ) -> pa.Table:
+        columns = columns or self.columns(dataset, table)
+        projection = ", ".join(f'"{column}"' for column in columns)
+        sql = f'SELECT {projection} FROM "{dataset}"."{table}"'
+        if filters:
+            sql += " WHERE " + " AND ".join(condition for condition, _ in filters)
+        sql += f" ORDER BY {order_by}"
+        return self.query(sql, [value for _, value in filters], dataset=dataset)
+
+    def ohlc(
+        self,
+        dataset: str,
+        columns: Optional[Sequence[str]] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        table: str = "ohlc",
+    ) -> pa.Table:
+        """
+        Load OHLC prices loaded by `coingecko_prices`.
+
+        Args:
+            dataset: dlt dataset, e.g. 'weth_coingecko'
+            columns: Columns to load, defaults to timestamp and OHLC
+            start: First timestamp, inclusive
+            end: Last timestamp, exclusive
+            table: Table name
+
+        Returns:
+            Arrow table sorted by timestamp
+        """
+        filters = []
+        if start is not None:
+            filters.append(("timestamp >= ?", start))
+        if end is not None:
+            filters.append(("timestamp < ?", end))
+        return self._select(
+            dataset,
+            table,
+            columns or list(COINGECKO_OHLC_COLUMNS),
+            filters,
+            "timestamp",
+        )
+
+    def controller_logs(
+        self,
+        dataset: str = "controllers",
+        columns: Optional[Sequence[str]] = None,
+        from_block: Optional[int] = None,
+        to_block: Optional[int] = None,
+        topic0: Optional[str] = None,
+        table: str = "logs",
+    ) -> pa.Table:
+        """
+        Load Controller logs loaded by `etherscan_logs` or `rpc_logs`.
+
+        Args:
+            dataset: dlt dataset
+            columns: Columns to load, defaults to all but the dlt columns
+            from_block: First block, inclusive
+            to_block: Last block, inclusive
+            topic0: Event signature, e.g. UserState
+            table: Table name
+
+        Returns:
+            Arrow table sorted by block number and log index
+        """
+        # Block numbers and log indexes are stored as hex strings, Etherscan returns '0x' for 0
+        block_number = "CAST(block_number AS BIGINT)"
+        log_index = "coalesce(CAST(nullif(log_index, '0x') AS BIGINT), 0)"
+        filters = []
+        if from_block is not None:
+            filters.append((f"{block_number} >= ?", from_block))
+        if to_block is not None:
+            filters.append((f"{block_number} <= ?", to_block))
+        if topic0 is not None:
+            filters.append(("json_extract_string(topics, '$[0]') = ?", topic0))
+        return self._select(
+            dataset, table, columns, filters, f"{block_number}, {log_index}"
+        )
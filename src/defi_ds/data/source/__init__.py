@@ -1,4 +1,5 @@
 from .coingecko import coingecko_prices
 from .etherscan import etherscan_logs, etherscan_transactions
+from .rpc import rpc_logs
 
-__all__ = ["coingecko_prices", "etherscan_logs", "etherscan_transactions"]
+__all__ = ["coingecko_prices", "etherscan_logs", "etherscan_transactions", "rpc_logs"]
@@ -0,0 +1,304 @@
+import asyncio
+import re
+from typing import Any, Dict, List, Optional, Tuple, Union
+import httpx
+import dlt
+from defi_ds.config import *
+
+
+class RPCError(Exception):
+    """Error returned by the JSON-RPC server for a single call."""
+
+    def __init__(self, error: Dict[str, Any]):
+        self.code = error.get("code")
+        self.message = error.get("message", "")
+        super().__init__(f"{self.code}: {self.message}")
+
+
+class BatchRejectedError(RPCError):
+    """The server rejected a whole batch request, e.g. too many calls per batch."""
+
+
+# Errors of eth_getLogs meaning the block range or the result is too large
+LOG_LIMIT_CODES = {-32005}
+LOG_LIMIT_MESSAGE = re.compile(
+    r"more than \d+ results|too many results|block range|range (is )?too (large|wide)"
+    r"|response size|limit exceeded|query timeout",
+    re.IGNORECASE,
+)
+
+
+def is_log_limit_error(error: RPCError) -> bool:
+    """Whether an eth_getLogs error can be solved by querying a smaller block range."""
+    return error.code in LOG_LIMIT_CODES or bool(
+        LOG_LIMIT_MESSAGE.search(error.message)
+    )
+
+
+class JSONRPCClient:
+    """
+    Async JSON-RPC client sending many calls per HTTP request over a pooled connection.
+
+    Args:
+        rpc_url: JSON-RPC endpoint
+        batch_size: Number of calls per HTTP request, halved when the server rejects a batch
+        max_connections: Size of the connection pool, also the number of batches in flight
+        max_retries: Retries of a batch on transport errors, 429 and 5xx responses
+        timeout: Request timeout in seconds
+    """
+
+    def __init__(
+        self,
+        rpc_url: str,
+        batch_size: int = 20,
+        max_connections: int = 4,
+        max_retries: int = 5,
+        timeout: float = 60,
+    ):
+        self.rpc_url = rpc_url
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            timeout=timeout,
+        )
+        self.semaphore = asyncio.Semaphore(max_connections)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.client.aclose()
+
+    async def batch(self, calls: List[Tuple[str, list]]) -> List[Union[Any, RPCError]]:
+        """
+        Send calls as one batch request.
+
+        Args:
+            calls: List of (method, params)
+
+        Returns:
+            Results in the order of calls, an RPCError for each failed or missing call
+        """
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+            for i, (method, params) in enumerate(calls)
+        ]
+
+        for attempt in range(self.max_retries + 1):
+            retry = attempt < self.max_retries
+            try:
+                async with self.semaphore:
+                    response = await self.client.post(self.rpc_url, json=payload)
+            except httpx.TransportError:
+                if not retry:
+                    raise
+            else:
+                if not retry or (
+                    response.status_code != 429 and response.status_code < 500
+                ):
+                    break
+            await asyncio.sleep(2**attempt)
+        response.raise_for_status()
+
+        data = response.json()
+        if isinstance(data, dict):
+            # The whole batch was rejected
+            raise BatchRejectedError(data.get("error", {}))
+
+        missing = RPCError({"message": "no response for the call"})
+        results: List[Union[Any, RPCError]] = [missing] * len(calls)
+        for item in data:
+            if item.get("id") not in range(len(calls)):
+                continue
+            results[item["id"]] = (
+                RPCError(item["error"]) if "error" in item else item.get("result")
+            )
+        return results
+
+    async def batches(
+        self, calls: List[Tuple[str, list]]
+    ) -> List[Union[Any, RPCError]]:
+        """
+        Split calls into batches of batch_size and send them concurrently, splitting the
+        batches the server rejects.
+        """
+        chunks = await asyncio.gather(
+            *(
+                self._split_batch(calls[i : i + self.batch_size])
+                for i in range(0, len(calls), self.batch_size)
+            )
+        )
+        return [result for chunk in chunks for result in chunk]
+
+    async def _split_batch(
+        self, calls: List[Tuple[str, list]]
+    ) -> List[Union[Any, RPCError]]:
+        try:
+            return await self.batch(calls)
+        except BatchRejectedError:
+            if len(calls) == 1:
+                raise
+            half = len(calls) // 2
+            self.batch_size = max(1, min(self.batch_size, half))
+            first, second = await asyncio.gather(
+                self._split_batch(calls[:half]), self._split_batch(calls[half:])
+            )
+            return first + second
+
+
+def map_log(
+    log: Dict[str, Any],
+    timestamps: Dict[str, str],
+    receipts: Dict[str, Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Map a JSON-RPC log to the Etherscan getLogs record."""
+    receipt = receipts.get(log["transactionHash"], {})
+    return {
+        "address": log["address"],
+        "topics": log["topics"],
+        "data": log["data"],
+        "blockNumber": log["blockNumber"],
+        "blockHash": log["blockHash"],
+        "timeStamp": timestamps[log["blockNumber"]],
+        "gasPrice": receipt.get("effectiveGasPrice"),
+        "gasUsed": receipt.get("gasUsed"),
+        "logIndex": log["logIndex"],
+        "transactionHash": log["transactionHash"],
+        "transactionIndex": log["transactionIndex"],
+    }
+
+
+@dlt.resource(columns=ETHERSCAN_LOG_COLUMNS)
+async def rpc_logs(
+    address,
+    rpc_url: Optional[str] = RPC_URL,
+    fromBlock: int = 0,
+    toBlock: Optional[int] = None,
+    block_range: int = 2000,
+    max_block_range: int = 100_000,
+    batch_size: int = 20,
+    max_connections: int = 4,
+    include_gas: bool = True,
+):
+    """
+    Resource for logs of a contract from a JSON-RPC node, an alternative to `etherscan_logs`
+    with the same record schema.
+
+    Block ranges are fetched batch_size per HTTP request and max_connections requests at once.
+    The range halves when the node rejects a query for its result size or block range, and
+    doubles after a window of successful queries, up to max_block_range. Other errors are
+    raised, including missing receipts, use include_gas=False with nodes without them.
+    batch_size halves when the node rejects a whole batch.
+
+    Args:
+        address: Contract address
+        rpc_url: JSON-RPC endpoint
+        fromBlock: First block
+        toBlock: Last block, defaults to the latest block
+        block_range: Initial number of blocks per eth_getLogs call
+        max_block_range: Upper limit of the number of blocks per eth_getLogs call
+        batch_size: Number of calls per HTTP request
+        max_connections: Size of the connection pool
+        include_gas: Fetch transaction receipts for gasPrice and gasUsed
+    """
+    async with JSONRPCClient(
+        rpc_url, batch_size=batch_size, max_connections=max_connections
+    ) as client:
+        if toBlock is None:
+            (latest,) = await client.batch([("eth_blockNumber", [])])
+            if isinstance(latest, RPCError):
+                raise latest
+            toBlock = int(latest, 16)
+
+        start = fromBlock
+        while start <= toBlock:
+            # Split the next window into block ranges
+            ranges = []
+            while (
+                start <= toBlock and len(ranges) < client.batch_size * max_connections
+            ):
+                end = min(start + block_range - 1, toBlock)
+                ranges.append((start, end))
+                start = end + 1
+
+            logs = []
+            shrunk = False
+            while ranges:
+                results = await client.batches(
+                    [
+                        (
+                            "eth_getLogs",
+                            [
+                                {
+                                    "address": address,
+                                    "fromBlock": hex(block_from),
+                                    "toBlock": hex(block_to),
+                                }
+                            ],
+                        )
+                        for block_from, block_to in ranges
+                    ]
+                )
+
+                # Retry rejected ranges in halves
+                retry = []
+                for (block_from, block_to), result in zip(ranges, results):
+                    if isinstance(result, list):
+                        logs.extend(result)
+                    elif not isinstance(result, RPCError):
+                        raise RPCError(
+                            {"message": f"invalid eth_getLogs result {result}"}
+                        )
+                    elif block_from == block_to or not is_log_limit_error(result):
+                        raise result
+                    else:
+                        middle = (block_from + block_to) // 2
+                        retry.extend([(block_from, middle), (middle + 1, block_to)])
+                        block_range = max(1, (block_to - block_from + 1) // 2)
+                        shrunk = True
+                ranges = retry
+
+            if not shrunk:
+                block_range = min(block_range * 2, max_block_range)
+
+            if not logs:
+                continue
+
+            logs.sort(
+                key=lambda log: (int(log["blockNumber"], 16), int(log["logIndex"], 16))
+            )
+
+            block_numbers = list(dict.fromkeys(log["blockNumber"] for log in logs))
+            blocks = await client.batches(
+                [
+                    ("eth_getBlockByNumber", [block_number, False])
+                    for block_number in block_numbers
+                ]
+            )
+            timestamps = {}
+            for block_number, block in zip(block_numbers, blocks):
+                if isinstance(block, RPCError):
+                    raise block
+                timestamps[block_number] = block["timestamp"]
+
+            receipts = {}
+            if include_gas:
+                tx_hashes = list(dict.fromkeys(log["transactionHash"] for log in logs))
+                results = await client.batches(
+                    [("eth_getTransactionReceipt", [tx_hash]) for tx_hash in tx_hashes]
+                )
+                for tx_hash, receipt in zip(tx_hashes, results):
+                    if isinstance(receipt, RPCError):
+                        raise receipt
+                    if receipt is None:
+                        # Pruned or lagging nodes return null for receipts they lack
+                        raise RPCError(
+                            {"message": f"no receipt for transaction {tx_hash}"}
+                        )
+                    receipts[tx_hash] = receipt
+
+            yield [map_log(log, timestamps, receipts) for log in logs]
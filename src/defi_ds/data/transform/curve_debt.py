@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import os
 
@@ -108,3 +109,61 @@ def decode_user_state_data(data: str) -> dict:
     }
 
     return result
+
+
+def borrower_positions(df: pd.DataFrame, collateral_decimals: int = 18) -> pd.DataFrame:
+    """
+    Build the latest position of every borrower from UserState logs, keeping all decoded fields.
+
+    Args:
+        df (pd.DataFrame): Input DataFrame which contains the UserState logs with fields:
+            - user: str
+            - block_number: int or hex str
+            - log_index: int or hex str, Etherscan returns '0x' for 0
+            - data: str, hex encoded event data
+            The latest state of a user is the one with the highest (block_number, log_index),
+            as several events can share a block timestamp.
+        collateral_decimals (int): Decimals of the collateral token
+    Returns:
+        pd.DataFrame: One row per borrower with non-zero debt with fields:
+            - user: str
+            - collateral: float, in collateral token units
+            - debt: float, in crvUSD
+            - n1: int, top band
+            - n2: int, bottom band
+            - liquidation_discount: float, as a fraction
+    """
+
+    def log_position(value):
+        """Convert a hex string (possibly '0x') or int to int"""
+        if isinstance(value, str):
+            return int(value, 16) if len(value) > 2 else 0
+        return int(value)
+
+    # Only the last state of each user matters, in log order. Sort by position, the index
+    # of concatenated logs can repeat labels.
+    order = np.lexsort(
+        (
+            df["log_index"].map(log_position).to_numpy(),
+            df["block_number"].map(log_position).to_numpy(),
+        )
+    )
+    latest = df.iloc[order].groupby("user", sort=False).tail(1).reset_index(drop=True)
+
+    decoded = pd.DataFrame(
+        latest["data"].apply(decode_user_state_data).tolist(), index=latest.index
+    )
+
+    positions = pd.DataFrame(
+        {
+            "user": latest["user"],
+            "collateral": decoded["collateral"].astype(float) / 10**collateral_decimals,
+            "debt": decoded["debt"].astype(float) / 1e18,
+            "n1": decoded["n1"].astype("int64"),
+            "n2": decoded["n2"].astype("int64"),
+            "liquidation_discount": decoded["liquidation_discount"].astype(float)
+            / 1e18,
+        }
+    )
+
+    return positions[positions["debt"] != 0].reset_index(drop=True)
@@ -1,3 +1,4 @@
 from .asset_volatility import AssetVolatility
+from .liquidation_stress import LiquidationStress
 
-__all__ = ["AssetVolatility"]
+__all__ = ["AssetVolatility", "LiquidationStress"]
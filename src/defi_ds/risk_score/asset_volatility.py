@@ -2,8 +2,14 @@ import math
 from typing import Optional, Dict, Union
 import numpy as np
 import pandas as pd
-from .calculator import garman_klass_volatility, score_with_limits
-from .utils import round_value
+from .calculator import (
+    block_bootstrap_indices,
+    garman_klass_terms,
+    nested_block_bootstrap_indices,
+    garman_klass_volatility,
+    score_with_limits,
+)
+from .utils import align_asof, round_value, score_interval
 
 
 class AssetVolatility:
@@ -11,7 +17,9 @@ class AssetVolatility:
     Class to calculate asset volatility using the Garman-Klass method.
 
     Args:
-        df: DataFrame with columns ['open', 'high', 'low', 'close']
+        df: DataFrame with columns ['open', 'high', 'low', 'close'], and optionally 'timestamp'
+            to align with the reference on timestamps instead of the index
+        reference_df: DataFrame with reference OHLC data, usually BTC
 
     """
 
@@ -25,6 +33,40 @@ class AssetVolatility:
         self.reference_df = reference_df
         self.trading_periods = trading_periods
 
+    @staticmethod
+    def _indexed(price_data: pd.DataFrame) -> pd.DataFrame:
+        """OHLC data indexed by timestamp when available, sorted."""
+        if "timestamp" in price_data:
+            price_data = price_data.set_axis(pd.to_datetime(price_data["timestamp"]))
+        return price_data.sort_index()
+
+    def _aligned(self) -> pd.DataFrame:
+        """
+        Returns and Garman-Klass terms of the asset and reference on their common timestamps.
+        """
+        asset = self._indexed(self.df)
+        reference = self._indexed(self.reference_df)
+        if ("timestamp" in self.df) != ("timestamp" in self.reference_df):
+            raise ValueError(
+                "df and reference_df must both have a 'timestamp' column, or neither"
+            )
+        aligned = align_asof(
+            {
+                "asset": asset["close"],
+                "reference": reference["close"],
+                "asset_terms": garman_klass_terms(asset),
+                "reference_terms": garman_klass_terms(reference),
+            }
+        )
+        aligned[["asset", "reference"]] = aligned[["asset", "reference"]].pct_change()
+        return aligned.dropna()
+
+    def aligned_returns(self) -> pd.DataFrame:
+        """
+        Returns of the asset and reference close prices on their common timestamps.
+        """
+        return self._aligned()[["asset", "reference"]]
+
     def volatility_ratio_score(
         self,
         window1: int = 45,
@@ -64,16 +106,12 @@ class AssetVolatility:
         Returns:
             Dictionary with beta analysis values and score
         """
-        # Calculate returns
-        asset_returns = self.df["close"].pct_change().dropna()
-        reference_returns = self.reference_df["close"].pct_change().dropna()
+        # Calculate returns on aligned data
+        returns = self.aligned_returns()
+        asset_returns = returns["asset"]
+        reference_returns = returns["reference"]
 
-        # Align data
-        common_index = asset_returns.index.intersection(reference_returns.index)
-        asset_returns = asset_returns.loc[common_index]
-        reference_returns = reference_returns.loc[common_index]
-
-        if len(common_index) < 30:  # Need minimum data points
+        if len(returns) < 30:  # Need minimum data points
             return {
                 "Asset volatility": 0.0,
                 "Reference volatility": 0.0,
@@ -178,3 +216,127 @@ class AssetVolatility:
             "VaR score": self.var_score(),
             "Final score": self.final_score(),
         }
+
+    def _bootstrap_volatility(self, terms: np.ndarray) -> np.ndarray:
+        """
+        Garman-Klass volatility of each resample, terms has shape (n_resamples x days).
+        """
+        return np.sqrt(self.trading_periods * terms.mean(axis=1))
+
+    def bootstrap_scores(
+        self,
+        n_resamples: int = 1000,
+        block_size: int = 5,
+        window1: int = 45,
+        window2: int = 180,
+        seed: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Calculate score distributions with a moving block bootstrap of daily returns.
+
+        All resamples are drawn at once as (n_resamples x days) arrays.
+
+        Args:
+            n_resamples: Number of bootstrap resamples
+            block_size: Length of the resampled blocks of consecutive days
+            window1: Short window of the volatility ratio
+            window2: Long window of the volatility ratio
+            seed: Seed of the random generator
+
+        Returns:
+            DataFrame with one row per resample of the metrics and scores
+        """
+        rng = np.random.default_rng(seed)
+        zeros = np.zeros(n_resamples)
+
+        # Volatility ratio, the short window is the tail of each long window resample
+        terms = garman_klass_terms(self.df).dropna().to_numpy()[-window2:]
+
+        if len(terms) <= window1:
+            # Without history before the short window the ratio is always 1
+            ratio, volatility_score = zeros, zeros
+        else:
+            resampled = terms[
+                nested_block_bootstrap_indices(
+                    len(terms), window1, n_resamples, block_size, rng
+                )
+            ]
+            ratio = self._bootstrap_volatility(
+                resampled[:, -window1:]
+            ) / self._bootstrap_volatility(resampled)
+            volatility_score = score_with_limits(ratio, 1.5, 0.75)
+
+        # Beta, correlation and both volatilities from the same resampled days
+        aligned = self._aligned()
+
+        if len(aligned) < 30:
+            beta, beta_score = zeros, zeros
+        else:
+            indices = nested_block_bootstrap_indices(
+                len(aligned), 45, n_resamples, block_size, rng
+            )
+            asset = aligned["asset"].to_numpy()[indices]
+            reference = aligned["reference"].to_numpy()[indices]
+            asset = asset - asset.mean(axis=1, keepdims=True)
+            reference = reference - reference.mean(axis=1, keepdims=True)
+            correlation = (asset * reference).sum(axis=1) / np.sqrt(
+                (asset**2).sum(axis=1) * (reference**2).sum(axis=1)
+            )
+
+            recent = indices[:, -45:]
+            beta = correlation * (
+                self._bootstrap_volatility(aligned["asset_terms"].to_numpy()[recent])
+                / self._bootstrap_volatility(
+                    aligned["reference_terms"].to_numpy()[recent]
+                )
+            )
+            beta_score = score_with_limits(beta, 2.5, 0.5, reverse=False, target=1.75)
+
+        # VaR
+        daily_returns = self.df["close"].pct_change().dropna().to_numpy()
+
+        if len(daily_returns) < 30:
+            var_99, var_score = zeros, zeros
+        else:
+            indices = block_bootstrap_indices(
+                len(daily_returns), n_resamples, block_size, rng
+            )
+            var_99 = np.percentile(daily_returns[indices], 1, axis=1)
+            var_score = score_with_limits(
+                var_99, -0.01, -0.12, reverse=True, target=-0.085
+            )
+
+        return pd.DataFrame(
+            {
+                "Volatility ratio": ratio,
+                "Volatility score": volatility_score,
+                "Beta": beta,
+                "Beta score": beta_score,
+                "99% VaR": var_99,
+                "VaR score": var_score,
+                "Final score": volatility_score * 0.3
+                + beta_score * 0.3
+                + var_score * 0.4,
+            }
+        )
+
+    def bootstrap_score_dict(
+        self,
+        n_resamples: int = 1000,
+        block_size: int = 5,
+        window1: int = 45,
+        window2: int = 180,
+        confidence: float = 0.95,
+        seed: Optional[int] = None,
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        Calculate bootstrap mean and confidence interval of each metric and score.
+        """
+        scores = self.bootstrap_scores(
+            n_resamples=n_resamples,
+            block_size=block_size,
+            window1=window1,
+            window2=window2,
+            seed=seed,
+        )
+        return {column: score_interval(scores[column], confidence) for column in scores}
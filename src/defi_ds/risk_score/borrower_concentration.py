@@ -2,8 +2,14 @@ import math
 from typing import Optional, Dict, Union
 import numpy as np
 import pandas as pd
-from .calculator import garman_klass_volatility, score_with_limits, hhi
-from .utils import round_value, ffill_df
+from .calculator import (
+    block_bootstrap_indices,
+    nested_block_bootstrap_indices,
+    garman_klass_volatility,
+    score_with_limits,
+    hhi,
+)
+from .utils import round_value, ffill_df, score_interval
 
 
 class BorrowerConcentration:
@@ -75,3 +81,84 @@ class BorrowerConcentration:
             "Ratio": round_value(current_hhi / current_hhi_ideal, 4),
             "Benchmark score": round_value(score),
         }
+
+    def bootstrap_scores(
+        self,
+        n_resamples: int = 1000,
+        block_size: int = 3,
+        recent_days: int = 7,
+        history_days: int = 30,
+        seed: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Calculate HHI ratio distributions by bootstrap.
+
+        The relative ratio resamples blocks of consecutive daily HHI over the history window
+        and takes the recent window from the tail of each resample, the benchmark ratio
+        resamples the borrowers of the last day.
+
+        Args:
+            n_resamples: Number of bootstrap resamples
+            block_size: Length of the resampled blocks of consecutive days
+            recent_days: Number of recent days to consider
+            history_days: Number of days to consider in the history
+            seed: Seed of the random generator
+
+        Returns:
+            DataFrame with one row per resample of the ratios and scores
+        """
+        rng = np.random.default_rng(seed)
+
+        # Relative HHI, the recent window is the tail of each history resample
+        history_hhi = self.daily_hhi["hhi"].to_numpy(dtype=np.float64)[-history_days:]
+        resampled = history_hhi[
+            nested_block_bootstrap_indices(
+                len(history_hhi), recent_days, n_resamples, block_size, rng
+            )
+        ]
+        relative_ratio = resampled[:, -recent_days:].mean(axis=1) / resampled.mean(
+            axis=1
+        )
+
+        # Benchmark HHI
+        last_date = pd.to_datetime(self.df["date"]).max()
+        debts = self.df.loc[
+            pd.to_datetime(self.df["date"]) == last_date, "debt"
+        ].to_numpy(dtype=np.float64)
+        resampled = debts[block_bootstrap_indices(len(debts), n_resamples, 1, rng)]
+        benchmark_ratio = (resampled**2).sum(axis=1) / (
+            resampled.sum(axis=1) ** 2 / len(debts)
+        )
+
+        return pd.DataFrame(
+            {
+                "Relative ratio": relative_ratio,
+                "Relative score": score_with_limits(relative_ratio, 1.1, 0.9, 1.06),
+                "Benchmark ratio": benchmark_ratio,
+                "Benchmark score": score_with_limits(benchmark_ratio, 1.1, 0.9, 1.06),
+            }
+        )
+
+    def bootstrap_score_dict(
+        self,
+        n_resamples: int = 1000,
+        block_size: int = 3,
+        recent_days: int = 7,
+        history_days: int = 30,
+        confidence: float = 0.95,
+        seed: Optional[int] = None,
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        Calculate bootstrap mean and confidence interval of each ratio and score.
+        """
+        scores = self.bootstrap_scores(
+            n_resamples=n_resamples,
+            block_size=block_size,
+            recent_days=recent_days,
+            history_days=history_days,
+            seed=seed,
+        )
+        return {
+            column: score_interval(scores[column], confidence, decimals=4)
+            for column in scores
+        }
@@ -4,12 +4,17 @@ import pandas as pd
 import numpy as np
 
 
-def garman_klass_volatility(price_data, window=30, trading_periods=252, clean=True):
-
+def garman_klass_terms(price_data):
+    """Daily Garman-Klass variance terms, the volatility is the annualised root of their mean."""
     log_hl = (price_data["high"] / price_data["low"]).apply(np.log)
     log_co = (price_data["close"] / price_data["open"]).apply(np.log)
 
-    rs = 0.5 * log_hl**2 - (2 * math.log(2) - 1) * log_co**2
+    return 0.5 * log_hl**2 - (2 * math.log(2) - 1) * log_co**2
+
+
+def garman_klass_volatility(price_data, window=30, trading_periods=252, clean=True):
+
+    rs = garman_klass_terms(price_data)
 
     def f(v):
         return (trading_periods * v.mean()) ** 0.5
@@ -32,6 +37,8 @@ def score_with_limits(
     """
     Score a value based on limits, with optional target value for peak scoring.
 
+    Works element-wise when value is an array, e.g. a bootstrap distribution.
+
     Args:
         value: Value to score
         upper_limit: Upper boundary
@@ -40,43 +47,22 @@ def score_with_limits(
         target: Target value for peak scoring (optional)
 
     Returns:
-        Score between 0 and 1
+        Score between 0 and 1, same shape as value
     """
-    if pd.isna(value):
-        return 0.0
-
     if target is not None:
-        # Peak scoring around target value
-        if reverse:
-            # For VaR: closer to target (less negative) is better
-            distance = abs(value - target)
-            max_distance = max(abs(upper_limit - target), abs(lower_limit - target))
-            score = 1 - (distance / max_distance)
-        else:
-            # For other metrics: closer to target is better
-            distance = abs(value - target)
-            max_distance = max(abs(upper_limit - target), abs(lower_limit - target))
-            score = 1 - (distance / max_distance)
+        # Peak scoring around target value, closer to target is better
+        distance = np.abs(value - target)
+        max_distance = max(abs(upper_limit - target), abs(lower_limit - target))
+        score = 1 - (distance / max_distance)
+    elif reverse:
+        # Higher values get better scores (for VaR, less negative is better)
+        score = (value - lower_limit) / (upper_limit - lower_limit)
     else:
-        # Linear scoring between limits
-        if reverse:
-            # Higher values get better scores (for VaR, less negative is better)
-            if value >= upper_limit:
-                score = 1.0
-            elif value <= lower_limit:
-                score = 0.0
-            else:
-                score = (value - lower_limit) / (upper_limit - lower_limit)
-        else:
-            # Lower values get better scores
-            if value <= lower_limit:
-                score = 1.0
-            elif value >= upper_limit:
-                score = 0.0
-            else:
-                score = (upper_limit - value) / (upper_limit - lower_limit)
-
-    return np.clip(score, 0.0, 1.0)
+        # Lower values get better scores
+        score = (upper_limit - value) / (upper_limit - lower_limit)
+
+    # Missing values score 0
+    return np.nan_to_num(np.clip(score, 0.0, 1.0), nan=0.0)
 
 
 def hhi(borrower_debts: list[float]) -> Tuple[float, float]:
@@ -108,3 +94,65 @@ def hhi(borrower_debts: list[float]) -> Tuple[float, float]:
     # hhi_ratio = hhi / hhi_ideal
 
     return hhi, hhi_ideal
+
+
+def block_bootstrap_indices(
+    n: int,
+    n_resamples: int,
+    block_size: int = 5,
+    rng: Optional[np.random.Generator] = None,
+) -> np.ndarray:
+    """
+    Moving block bootstrap indices, consecutive blocks preserve autocorrelation.
+
+    Args:
+        n: Number of observations
+        n_resamples: Number of resamples
+        block_size: Length of each block, 1 is the plain bootstrap
+        rng: Random generator
+
+    Returns:
+        Integer array of shape (n_resamples, n), index the observations with it to get all resamples
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    block_size = max(1, min(block_size, n))
+    n_blocks = -(-n // block_size)
+
+    starts = rng.integers(0, n - block_size + 1, size=(n_resamples, n_blocks))
+    indices = starts[:, :, np.newaxis] + np.arange(block_size)
+
+    return indices.reshape(n_resamples, -1)[:, :n]
+
+
+def nested_block_bootstrap_indices(
+    n: int,
+    n_tail: int,
+    n_resamples: int,
+    block_size: int = 5,
+    rng: Optional[np.random.Generator] = None,
+) -> np.ndarray:
+    """
+    Moving block bootstrap indices of a long window whose last n_tail columns are resampled
+    from the last n_tail observations only.
+
+    A short window taken from the tail of each resample is then part of the same resample as
+    the long window, and still made of recent observations.
+
+    Args:
+        n: Number of observations in the long window
+        n_tail: Number of observations in the short window
+        n_resamples: Number of resamples
+        block_size: Length of each block
+        rng: Random generator
+
+    Returns:
+        Integer array of shape (n_resamples, n)
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    n_tail = min(n_tail, n)
+    tail = block_bootstrap_indices(n_tail, n_resamples, block_size, rng) + n - n_tail
+    if n_tail == n:
+        return tail
+
+    head = block_bootstrap_indices(n - n_tail, n_resamples, block_size, rng)
+    return np.concatenate([head, tail], axis=1)
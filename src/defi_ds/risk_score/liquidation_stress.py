@@ -0,0 +1,180 @@
+from typing import Optional, Dict, Iterator
+import numpy as np
+import pandas as pd
+
+
+class LiquidationStress:
+    """
+    Class to stress test borrower positions of a crvUSD market against collateral price shocks.
+
+    Band prices follow LLAMMA: the upper price of band n is base_price * ((A - 1) / A) ** n,
+    so n1 is the top (highest price) band of a position and n2 the bottom one.
+
+    Health is approximated as collateral * (1 - liquidation_discount) * v / debt - 1, where v is
+    the average value of the position's bands per unit of collateral. Bands the price has not
+    crossed are valued at min(price, band mid price), the collateral value obtained by trading
+    down through them as in the Controller's health. Bands the price has crossed were converted
+    to crvUSD at their mid price, less soft_liquidation_loss, and no longer lose value as the
+    price falls.
+
+    Args:
+        df: DataFrame with columns ['collateral', 'debt', 'n1', 'n2', 'liquidation_discount'],
+            see `defi_ds.data.transform.curve_debt.borrower_positions`
+        price: Current oracle price of the collateral
+        base_price: AMM base price
+        A: AMM amplification, band width is 1 / A
+        soft_liquidation_loss: Fraction of the value of a band lost when it is converted
+
+    """
+
+    # Number of (borrower, shock) pairs evaluated at once
+    chunk_size = 2**18
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        price: float,
+        base_price: float,
+        A: int = 100,
+        soft_liquidation_loss: float = 0.0,
+    ):
+        self.df = df
+        self.price = price
+        self.base_price = base_price
+        self.A = A
+        self.soft_liquidation_loss = soft_liquidation_loss
+
+        self.collateral = df["collateral"].to_numpy(dtype=np.float64)
+        self.debt = df["debt"].to_numpy(dtype=np.float64)
+        self.n1 = df["n1"].to_numpy(dtype=np.float64)
+        self.n2 = df["n2"].to_numpy(dtype=np.float64)
+        self.liquidation_discount = df["liquidation_discount"].to_numpy(
+            dtype=np.float64
+        )
+
+    def band_prices(self, n: np.ndarray) -> np.ndarray:
+        """
+        Upper price of band n, the lower price of band n is the upper price of band n + 1.
+        """
+        return self.base_price * ((self.A - 1) / self.A) ** n
+
+    def _state(self, shocks: np.ndarray, rows: slice) -> Dict[str, np.ndarray]:
+        """
+        Evaluate the positions in rows at every shocked price, as (borrowers x shocks) masks
+        and the collateral converted per shock.
+        """
+        ratio = (self.A - 1) / self.A
+        log_ratio = np.log(ratio)
+        loss = self.soft_liquidation_loss
+
+        p = self.price * (1 + shocks)
+        n1 = self.n1[rows, np.newaxis]
+        n_bands = self.n2[rows, np.newaxis] - n1 + 1
+        mid_top = self.band_prices(n1 + 0.5)
+
+        # Number of bands the price has moved below the top of the position
+        y = np.log(p)[np.newaxis, :] - np.log(self.band_prices(n1))
+        y /= log_ratio
+        soft_liquidation = y > 0
+        fully_converted = y >= n_bands
+
+        work = np.multiply(y, 1 / n_bands)
+        np.clip(work, 0.0, 1.0, out=work)
+        converted = self.collateral[rows] @ work
+
+        # The top m bands are crossed, band m holds the price. Mid prices form a geometric
+        # series, so with r = ratio and mid_m = mid_top * r ** m the sum of band values is
+        # (1 - loss) * (mid_top - mid_m) / (1 - r) for the crossed bands,
+        # (mid_m - mid_top * r ** n_bands) / (1 - r) for the others, and
+        # min(price, mid_m) - mid_m for band m. Raising the price to the bottom of the
+        # position cancels the last term once all bands are crossed.
+        np.floor(y, out=work)
+        np.clip(work, 0.0, n_bands, out=work)
+        work *= log_ratio
+        mid_m = np.exp(work, out=work)
+        mid_m *= mid_top
+
+        in_band = np.maximum(p[np.newaxis, :], self.band_prices(n1 + n_bands), out=y)
+        in_band -= mid_m
+        np.minimum(in_band, 0.0, out=in_band)
+
+        value = mid_m
+        value *= loss / (1 - ratio)
+        value += mid_top * (1 - loss - ratio**n_bands) / (1 - ratio)
+        value += in_band
+
+        # health < 0 when the average band value is below debt / discounted collateral
+        threshold = self.debt[rows] / (
+            self.collateral[rows] * (1 - self.liquidation_discount[rows])
+        )
+
+        return {
+            "soft_liquidation": soft_liquidation,
+            "fully_converted": fully_converted,
+            "converted": converted,
+            "liquidatable": value < (threshold[:, np.newaxis] * n_bands),
+        }
+
+    def _chunks(self, n_shocks: int) -> Iterator[slice]:
+        step = max(1, self.chunk_size // max(n_shocks, 1))
+        for start in range(0, len(self.debt), step):
+            yield slice(start, start + step)
+
+    def stress_test(self, shocks: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        Calculate debt and collateral in soft liquidation and liquidatable for each price shock.
+
+        Args:
+            shocks: Relative collateral price changes, e.g. -0.2 for a 20% drop,
+                defaults to 0% to -90% in 1% steps
+
+        Returns:
+            DataFrame indexed by shock with the shocked price and aggregated debt and collateral
+        """
+        if shocks is None:
+            shocks = -np.arange(0, 91) / 100
+        shocks = np.asarray(shocks, dtype=np.float64)
+
+        totals = {
+            column: np.zeros(len(shocks))
+            for column in [
+                "users_in_soft_liquidation",
+                "debt_in_soft_liquidation",
+                "collateral_in_soft_liquidation",
+                "collateral_converted",
+                "users_fully_converted",
+                "users_liquidatable",
+                "debt_liquidatable",
+                "collateral_liquidatable",
+            ]
+        }
+        # Positions are evaluated in chunks of borrowers and summed per shock
+        for rows in self._chunks(len(shocks)):
+            state = self._state(shocks, rows)
+            weights = np.vstack(
+                [np.ones(len(self.debt[rows])), self.debt[rows], self.collateral[rows]]
+            )
+            users, debt, collateral = weights @ state["soft_liquidation"]
+            totals["users_in_soft_liquidation"] += users
+            totals["debt_in_soft_liquidation"] += debt
+            totals["collateral_in_soft_liquidation"] += collateral
+
+            users, debt, collateral = weights @ state["liquidatable"]
+            totals["users_liquidatable"] += users
+            totals["debt_liquidatable"] += debt
+            totals["collateral_liquidatable"] += collateral
+
+            totals["collateral_converted"] += state["converted"]
+            totals["users_fully_converted"] += state["fully_converted"].sum(axis=0)
+
+        result = pd.DataFrame(
+            {"price": self.price * (1 + shocks), **totals},
+            index=pd.Index(shocks, name="shock"),
+        )
+        for column in [
+            "users_in_soft_liquidation",
+            "users_fully_converted",
+            "users_liquidatable",
+        ]:
+            result[column] = result[column].astype("int64")
+        return result
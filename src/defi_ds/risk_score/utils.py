@@ -1,4 +1,5 @@
-from typing import Union
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Union
 import numpy as np
 import pandas as pd
 
@@ -13,16 +14,184 @@ def round_value(value: Union[float, np.number], decimals: int = 2) -> float:
 
 
 def ffill_df(
-    df: pd.DataFrame, date_col: str = "date", sort: bool = True
+    df: pd.DataFrame,
+    date_col: str = "date",
+    sort: bool = True,
+    keys: Optional[List[str]] = None,
+    freq: str = "D",
 ) -> pd.DataFrame:
-    df[date_col] = pd.to_datetime(df[date_col])
-    if sort:
-        df.sort_values(by=date_col, inplace=True)
-    date_range = pd.date_range(
-        start=df[date_col].iloc[0], end=df[date_col].iloc[-1], freq="D"
+    """
+    Reindex to a full calendar and forward fill, for a single series or a panel.
+
+    The calendar is filled with `align_asof`, each date taking the last row at or before it.
+
+    Args:
+        df: DataFrame with a date column, unique per date (and key)
+        date_col: Name of the date column
+        sort: Sort by date, set False if df is already sorted by date, unsorted data raises
+        keys: Panel key columns, e.g. ['address'] for market x date, each key is
+            forward filled from its own first date
+        freq: Calendar frequency
+
+    Returns:
+        DataFrame with a row for every date (and key) from the first to the last date
+    """
+    index = [*(keys or []), date_col]
+    indexed = df.set_index(
+        [df[key] for key in keys or []] + [pd.to_datetime(df[date_col])]
+    ).drop(columns=index)
+    if sort and not keys:
+        indexed = indexed.sort_index()
+
+    dates = indexed.index.get_level_values(-1)
+    calendar = pd.date_range(start=dates.min(), end=dates.max(), freq=freq)
+
+    if not keys:
+        return align_asof(indexed, index=calendar).rename_axis(date_col).reset_index()
+
+    # Every key on the calendar from its own first date
+    first_dates = (
+        pd.Series(dates, index=indexed.index.droplevel(-1))
+        .groupby(level=keys, sort=False)
+        .min()
     )
-    return (
-        pd.DataFrame({date_col: date_range})
-        .merge(df, on=date_col, how="left")
-        .fillna(method="ffill")
+    starts = calendar.searchsorted(first_dates.to_numpy())
+    counts = len(calendar) - starts
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    key_values = first_dates.index.to_frame(index=False)
+    panel = pd.MultiIndex.from_arrays(
+        [key_values[key].to_numpy().repeat(counts) for key in keys]
+        + [calendar[np.repeat(starts, counts) + offsets]],
+        names=index,
+    )
+    return align_asof(indexed, index=panel).reset_index()
+
+
+def _asof_positions(source: pd.Index, target: pd.Index) -> np.ndarray:
+    """
+    Position in source of the last label at or before each target label, -1 if none.
+
+    With MultiIndexes the leading levels are keys matched exactly and the last level is
+    the timestamp.
+    """
+    if not isinstance(source, pd.MultiIndex):
+        if not source.is_monotonic_increasing:
+            raise ValueError("index must be sorted to align on it")
+        return source.searchsorted(target, side="right") - 1
+
+    # Rank keys and timestamps together, one binary search on (key, timestamp) codes
+    keys, _ = pd.factorize(source.droplevel(-1).append(target.droplevel(-1)))
+    times, _ = pd.factorize(
+        source.get_level_values(-1).append(target.get_level_values(-1)), sort=True
     )
+    codes = keys.astype(np.int64) * (times.max() + 1) + times
+    source_codes, target_codes = codes[: len(source)], codes[len(source) :]
+
+    order = np.argsort(source_codes, kind="stable")
+    sorted_codes = source_codes[order]
+    positions = np.searchsorted(sorted_codes, target_codes, side="right") - 1
+    found = positions >= 0
+    found[found] = (
+        keys[: len(source)][order[positions[found]]] == keys[len(source) :][found]
+    )
+    return np.where(found, order[np.clip(positions, 0, None)], -1)
+
+
+def align_asof(
+    data: Union[Dict[str, pd.Series], pd.DataFrame],
+    index: Optional[pd.Index] = None,
+    tolerance: Optional[pd.Timedelta] = None,
+) -> pd.DataFrame:
+    """
+    Align many series on timestamp indexes without merges.
+
+    Each column takes the last value of its series at or before each timestamp of the
+    target index, found by binary search. For panels, both indexes are MultiIndexes whose
+    last level is the timestamp and leading levels are keys, e.g. (market, date), and values
+    are only taken from the same key.
+
+    Args:
+        data: Series keyed by column name, or a DataFrame, each with a sorted index,
+            unsorted indexes raise a ValueError (panel indexes need not be sorted)
+        index: Target index, defaults to the intersection of all series indexes
+        tolerance: Maximum distance to the previous timestamp, older values are NaN
+
+    Returns:
+        DataFrame on the target index with one column per series
+    """
+    series = dict(data.items())
+    if index is None:
+        for s in series.values():
+            index = s.index if index is None else index.intersection(s.index)
+
+    target_times = index.get_level_values(-1)
+    aligned = {}
+    columns = {}
+    for name, s in series.items():
+        # Columns of a DataFrame share their index, search it once
+        if id(s.index) not in aligned:
+            positions = _asof_positions(s.index, index) if len(s) else None
+            missing = (
+                np.ones(len(index), dtype=bool) if positions is None else positions < 0
+            )
+            if tolerance is not None and positions is not None:
+                source_times = s.index.get_level_values(-1)[np.clip(positions, 0, None)]
+                missing |= np.asarray(target_times - source_times) > tolerance
+            aligned[id(s.index)] = (positions, missing)
+        positions, missing = aligned[id(s.index)]
+
+        if positions is None:
+            columns[name] = pd.Series(np.nan, index=index)
+            continue
+        column = pd.Series(s.to_numpy()[np.clip(positions, 0, None)], index=index)
+        columns[name] = column.where(~missing) if missing.any() else column
+
+    return pd.DataFrame(columns, index=index)
+
+
+def score_interval(
+    scores: np.ndarray, confidence: float = 0.95, decimals: int = 2
+) -> Dict[str, float]:
+    """Summarise a bootstrap distribution with its mean and percentile interval."""
+    tail = (1 - confidence) / 2 * 100
+    lower, upper = np.percentile(scores, [tail, 100 - tail])
+    return {
+        "Mean": round_value(np.mean(scores), decimals),
+        "Lower": round_value(lower, decimals),
+        "Upper": round_value(upper, decimals),
+    }
+
+
+def _bootstrap_score_dict(model: Any, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    return model.bootstrap_score_dict(**kwargs)
+
+
+def parallel_bootstrap(
+    models: Dict[str, Any],
+    max_workers: Optional[int] = None,
+    seed: Optional[int] = None,
+    **kwargs,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run `bootstrap_score_dict` of many score models, e.g. one per market, across a process pool.
+
+    Args:
+        models: Score models keyed by market, e.g. AssetVolatility or BorrowerConcentration
+        max_workers: Number of processes, defaults to the number of CPUs
+        seed: Seed spawning an independent random stream for each model
+        **kwargs: Passed to `bootstrap_score_dict`
+
+    Returns:
+        Bootstrap score intervals keyed by market
+    """
+    seeds = np.random.SeedSequence(seed).spawn(len(models))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            name: executor.submit(
+                _bootstrap_score_dict,
+                model,
+                {**kwargs, "seed": int(child.generate_state(1)[0])},
+            )
+            for (name, model), child in zip(models.items(), seeds)
+        }
+        return {name: future.result() for name, future in futures.items()}
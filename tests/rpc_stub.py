@@ -0,0 +1,153 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+
+class StubRPCServer:
+    """
+    Local Ethereum JSON-RPC server serving a fixed set of logs, for testing log sources.
+
+    Args:
+        logs: Logs returned by eth_getLogs, in the JSON-RPC format
+        latest_block: Result of eth_blockNumber
+        max_results: eth_getLogs returns a -32005 error above this number of logs
+        max_batch_size: Batches with more calls are rejected as a whole
+        error: Error returned by every eth_getLogs call
+        drop_ids: Ids of calls left without a response
+        method_errors: Error returned by every call of a method, by method
+        null_receipts: eth_getTransactionReceipt returns null, as pruned nodes do
+    """
+
+    def __init__(
+        self,
+        logs: List[Dict[str, Any]],
+        latest_block: int,
+        max_results: int = 100,
+        max_batch_size: Optional[int] = None,
+        error: Optional[Dict[str, Any]] = None,
+        drop_ids: bool = False,
+        method_errors: Optional[Dict[str, Dict[str, Any]]] = None,
+        null_receipts: bool = False,
+    ):
+        self.logs = logs
+        self.latest_block = latest_block
+        self.max_results = max_results
+        self.max_batch_size = max_batch_size
+        self.error = error
+        self.drop_ids = drop_ids
+        self.method_errors = method_errors or {}
+        self.null_receipts = null_receipts
+        self.requests = 0
+        self.calls: Dict[str, int] = {}
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                self._send(stub.handle_batch(body))
+
+            def _send(self, response):
+                out = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(out)))
+                self.end_headers()
+                self.wfile.write(out)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def handle_batch(self, body: List[Dict[str, Any]]):
+        self.requests += 1
+        if self.max_batch_size is not None and len(body) > self.max_batch_size:
+            return {
+                "jsonrpc": "2.0",
+                "id": None,
+                "error": {"code": -32600, "message": "batch too large"},
+            }
+
+        responses = []
+        for call in body:
+            if self.drop_ids:
+                call = {**call, "id": None}
+            responses.append({"jsonrpc": "2.0", "id": call["id"], **self.handle(call)})
+        return responses
+
+    def handle(self, call: Dict[str, Any]) -> Dict[str, Any]:
+        method, params = call["method"], call["params"]
+        self.calls[method] = self.calls.get(method, 0) + 1
+        if method in self.method_errors:
+            return {"error": self.method_errors[method]}
+
+        if method == "eth_blockNumber":
+            return {"result": hex(self.latest_block)}
+
+        if method == "eth_getLogs":
+            if self.error is not None:
+                return {"error": self.error}
+            block_from = int(params[0]["fromBlock"], 16)
+            block_to = int(params[0]["toBlock"], 16)
+            logs = [
+                log
+                for log in self.logs
+                if block_from <= int(log["blockNumber"], 16) <= block_to
+            ]
+            if len(logs) > self.max_results:
+                return {
+                    "error": {
+                        "code": -32005,
+                        "message": f"query returned more than {self.max_results} results",
+                    }
+                }
+            return {"result": logs}
+
+        if method == "eth_getBlockByNumber":
+            return {
+                "result": {
+                    "number": params[0],
+                    "timestamp": hex(1_700_000_000 + int(params[0], 16) * 12),
+                }
+            }
+
+        if method == "eth_getTransactionReceipt":
+            if self.null_receipts:
+                return {"result": None}
+            return {"result": {"gasUsed": "0x5208", "effectiveGasPrice": "0x3b9aca00"}}
+
+        return {"error": {"code": -32601, "message": "method not found"}}
+
+
+def make_logs(
+    address: str, latest_block: int, every: int = 7, per_block: int = 2
+) -> List[Dict[str, Any]]:
+    """Logs of a contract, per_block logs in every `every` block."""
+    return [
+        {
+            "address": address,
+            "topics": ["0x01", "0x02"],
+            "data": "0x" + "00" * 32,
+            "blockNumber": hex(block),
+            "blockHash": f"0x{block:064x}",
+            "logIndex": hex(index),
+            "transactionHash": f"0x{block * per_block + index:064x}",
+            "transactionIndex": "0x0",
+        }
+        for block in range(0, latest_block + 1, every)
+        for index in range(per_block)
+    ]
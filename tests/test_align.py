@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import pytest
+from defi_ds.risk_score.utils import align_asof, ffill_df
+
+
+def merge_ffill(df, date_col="date"):
+    """ffill_df before it was built on align_asof."""
+    df = df.assign(**{date_col: pd.to_datetime(df[date_col])}).sort_values(date_col)
+    date_range = pd.date_range(
+        start=df[date_col].iloc[0], end=df[date_col].iloc[-1], freq="D"
+    )
+    return (
+        pd.DataFrame({date_col: date_range}).merge(df, on=date_col, how="left").ffill()
+    )
+
+
+def test_align_asof_takes_last_value_at_or_before():
+    s = pd.Series(
+        [1.0, 2.0, 3.0],
+        index=pd.to_datetime(["2024-01-01", "2024-01-03", "2024-01-06"]),
+    )
+    index = pd.date_range("2023-12-31", "2024-01-07")
+
+    aligned = align_asof({"s": s}, index=index)
+
+    np.testing.assert_array_equal(aligned["s"], [np.nan, 1, 1, 2, 2, 2, 3, 3])
+
+
+def test_align_asof_tolerance():
+    s = pd.Series([1.0, 2.0], index=pd.to_datetime(["2024-01-01", "2024-01-05"]))
+    index = pd.date_range("2024-01-01", "2024-01-06")
+
+    aligned = align_asof({"s": s}, index=index, tolerance=pd.Timedelta(days=1))
+
+    np.testing.assert_array_equal(aligned["s"], [1, 1, np.nan, np.nan, 2, 2])
+
+
+def test_align_asof_rejects_unsorted_index():
+    s = pd.Series(
+        [1.0, 2.0, 3.0],
+        index=pd.to_datetime(["2024-01-03", "2024-01-01", "2024-01-02"]),
+    )
+
+    with pytest.raises(ValueError, match="sorted"):
+        align_asof({"s": s}, index=pd.to_datetime(["2024-01-03"]))
+
+    df = pd.DataFrame({"date": s.index, "value": s.to_numpy()})
+    with pytest.raises(ValueError, match="sorted"):
+        ffill_df(df, sort=False)
+
+
+def test_align_asof_panel_matches_keys():
+    source = pd.MultiIndex.from_arrays(
+        [
+            ["b", "a", "a", "b"],
+            pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-01", "2024-01-04"]),
+        ]
+    )
+    s = pd.Series([10.0, 2.0, 1.0, 20.0], index=source)
+    target = pd.MultiIndex.from_arrays(
+        [
+            ["a", "a", "a", "b", "b", "b", "c"],
+            pd.to_datetime(
+                [
+                    "2024-01-01",
+                    "2024-01-02",
+                    "2024-01-05",
+                    "2024-01-01",
+                    "2024-01-03",
+                    "2024-01-05",
+                    "2024-01-05",
+                ]
+            ),
+        ]
+    )
+
+    aligned = align_asof({"s": s}, index=target)
+
+    np.testing.assert_array_equal(aligned["s"], [1, 1, 2, np.nan, 10, 20, np.nan])
+
+
+def test_ffill_df_matches_merge_ffill():
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2024-01-01", "2024-03-31")
+    df = pd.DataFrame(
+        {
+            "date": dates,
+            "hhi": rng.uniform(size=len(dates)),
+            "ideal": rng.uniform(size=len(dates)),
+        }
+    ).iloc[rng.permutation(len(dates))[:40]]
+
+    pd.testing.assert_frame_equal(ffill_df(df), merge_ffill(df))
+
+
+def test_ffill_df_panel_starts_each_key_at_its_first_date():
+    df = pd.DataFrame(
+        {
+            "address": ["a", "b", "a", "b"],
+            "date": pd.to_datetime(
+                ["2024-01-01", "2024-01-03", "2024-01-04", "2024-01-05"]
+            ),
+            "debt": [1.0, np.nan, 2.0, 3.0],
+        }
+    )
+
+    filled = ffill_df(df, keys=["address"])
+
+    # Each key runs to the last date of the panel. A real row with only NaN values is kept,
+    # not taken for a date before the first row of its key.
+    expected = pd.DataFrame(
+        {
+            "address": ["a"] * 5 + ["b"] * 3,
+            "date": pd.to_datetime(
+                ["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05"]
+                + ["2024-01-03", "2024-01-04", "2024-01-05"]
+            ),
+            "debt": [1.0, 1.0, 1.0, 2.0, 2.0, np.nan, np.nan, 3.0],
+        }
+    )
+    pd.testing.assert_frame_equal(filled, expected)
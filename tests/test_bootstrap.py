@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+import pytest
+from defi_ds.risk_score import AssetVolatility
+from defi_ds.risk_score.calculator import (
+    block_bootstrap_indices,
+    nested_block_bootstrap_indices,
+    score_with_limits,
+)
+
+
+def branchy_score_with_limits(
+    value, upper_limit, lower_limit, reverse=False, target=None
+):
+    """score_with_limits before it worked element-wise."""
+    if pd.isna(value):
+        return 0.0
+    if target is not None:
+        distance = abs(value - target)
+        max_distance = max(abs(upper_limit - target), abs(lower_limit - target))
+        score = 1 - (distance / max_distance)
+    elif reverse:
+        if value >= upper_limit:
+            score = 1.0
+        elif value <= lower_limit:
+            score = 0.0
+        else:
+            score = (value - lower_limit) / (upper_limit - lower_limit)
+    else:
+        if value <= lower_limit:
+            score = 1.0
+        elif value >= upper_limit:
+            score = 0.0
+        else:
+            score = (upper_limit - value) / (upper_limit - lower_limit)
+    return np.clip(score, 0.0, 1.0)
+
+
+def prices(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, n)))
+    open_ = np.r_[100, close[:-1]]
+    spread = np.abs(rng.normal(0, 0.02, n))
+    return pd.DataFrame(
+        {
+            "open": open_,
+            "high": np.maximum(open_, close) * (1 + spread),
+            "low": np.minimum(open_, close) * (1 - spread),
+            "close": close,
+        }
+    )
+
+
+def test_block_bootstrap_indices():
+    indices = block_bootstrap_indices(
+        23, 100, block_size=5, rng=np.random.default_rng(0)
+    )
+
+    assert indices.shape == (100, 23)
+    assert indices.min() >= 0 and indices.max() < 23
+    # Blocks are runs of consecutive observations
+    blocks = indices[:, :20].reshape(100, 4, 5)
+    assert (np.diff(blocks, axis=2) == 1).all()
+
+
+def test_nested_block_bootstrap_indices_draws_tail_from_recent_rows():
+    indices = nested_block_bootstrap_indices(
+        180, 45, 200, block_size=5, rng=np.random.default_rng(0)
+    )
+
+    assert indices.shape == (200, 180)
+    assert (indices[:, -45:] >= 135).all() and (indices[:, -45:] < 180).all()
+    assert (indices[:, :-45] < 135).all() and (indices[:, :-45] >= 0).all()
+
+    # A tail as long as the window resamples the whole window
+    indices = nested_block_bootstrap_indices(30, 45, 10, rng=np.random.default_rng(0))
+    assert indices.shape == (10, 30)
+
+
+@pytest.mark.parametrize(
+    "limits",
+    [
+        {"upper_limit": 1.5, "lower_limit": 0.75},
+        {"upper_limit": -0.01, "lower_limit": -0.12, "reverse": True},
+        {"upper_limit": 2.5, "lower_limit": 0.5, "target": 1.75},
+        {"upper_limit": -0.01, "lower_limit": -0.12, "reverse": True, "target": -0.085},
+    ],
+)
+def test_score_with_limits_matches_scalar_scores(limits):
+    values = np.r_[np.linspace(-1, 3, 401), -0.12, -0.01, 0.75, 1.5, np.nan]
+
+    expected = [branchy_score_with_limits(value, **limits) for value in values]
+
+    np.testing.assert_allclose(score_with_limits(values, **limits), expected)
+    for value, score in zip(values, expected):
+        assert score_with_limits(value, **limits) == pytest.approx(score)
+
+
+def test_bootstrap_volatility_ratio_needs_history_before_short_window():
+    model = AssetVolatility(prices(20), prices(20, seed=1))
+
+    scores = model.bootstrap_scores(n_resamples=50, seed=0)
+
+    assert (scores["Volatility ratio"] == 0).all()
+    assert (scores["Volatility score"] == 0).all()
+
+
+def test_bootstrap_volatility_ratio_interval_contains_point_estimate():
+    model = AssetVolatility(prices(400), prices(400, seed=1))
+
+    ratio = model.volatility_ratio_score()["Volatility ratio"]
+    interval = model.bootstrap_score_dict(n_resamples=500, seed=0)["Volatility ratio"]
+
+    assert interval["Lower"] < interval["Upper"]
+    assert interval["Lower"] <= ratio <= interval["Upper"]
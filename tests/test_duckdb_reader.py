@@ -0,0 +1,128 @@
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import duckdb
+import pytest
+from defi_ds.data.duckdb_reader import DuckDBReader
+
+USER_STATE = "0xeec6b7095a637e006c79c1819d696e353a8f703db2c49fc0219e17a8fd04f7f2"
+
+
+def load(path, load_id, blocks):
+    """Append logs and OHLC rows the way a dlt load does, then complete the load."""
+    with duckdb.connect(str(path)) as connection:
+        for block in blocks:
+            connection.execute(
+                "INSERT INTO controllers.logs VALUES (?, ?, ?, ?, ?, ?)",
+                [f'["{USER_STATE}", "0x01"]', "0xabc", hex(block), "0x", load_id, "id"],
+            )
+            connection.execute(
+                "INSERT INTO weth_coingecko.ohlc VALUES (?, 1, 2, 0.5, 1.5, ?, ?)",
+                [datetime(2024, 1, 1 + block % 28), load_id, "id"],
+            )
+        for dataset in ["controllers", "weth_coingecko"]:
+            connection.execute(
+                f"INSERT INTO {dataset}._dlt_loads VALUES (?, 0)", [load_id]
+            )
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / "test.duckdb"
+    with duckdb.connect(str(path)) as connection:
+        for dataset in ["controllers", "weth_coingecko"]:
+            connection.execute(f"CREATE SCHEMA {dataset}")
+            connection.execute(
+                f"CREATE TABLE {dataset}._dlt_loads (load_id VARCHAR, status BIGINT)"
+            )
+        connection.execute(
+            "CREATE TABLE controllers.logs (topics JSON, address VARCHAR, "
+            "block_number VARCHAR, log_index VARCHAR, _dlt_load_id VARCHAR, "
+            "_dlt_id VARCHAR)"
+        )
+        connection.execute(
+            "CREATE TABLE weth_coingecko.ohlc (timestamp TIMESTAMP, open DOUBLE, "
+            "high DOUBLE, low DOUBLE, close DOUBLE, _dlt_load_id VARCHAR, _dlt_id VARCHAR)"
+        )
+    load(path, "1", range(10))
+    return path
+
+
+def test_filters_and_projection(path):
+    reader = DuckDBReader(path)
+
+    logs = reader.controller_logs(from_block=3, to_block=6, topic0=USER_STATE)
+    assert logs.column_names == ["topics", "address", "block_number", "log_index"]
+    assert logs.column("block_number").to_pylist() == ["0x3", "0x4", "0x5", "0x6"]
+
+    ohlc = reader.ohlc(
+        "weth_coingecko", columns=["timestamp", "close"], start=datetime(2024, 1, 5)
+    )
+    assert ohlc.column_names == ["timestamp", "close"]
+    assert ohlc.num_rows == 6
+
+
+def test_logs_are_in_log_order(path):
+    with duckdb.connect(str(path)) as connection:
+        for log_index in ["0x10", "0x2", "0x1"]:
+            connection.execute(
+                "INSERT INTO controllers.logs VALUES ('[]', '0xabc', '0x3', ?, '2', 'id')",
+                [log_index],
+            )
+        connection.execute("INSERT INTO controllers._dlt_loads VALUES ('2', 0)")
+
+    logs = DuckDBReader(path).controller_logs(from_block=3, to_block=3)
+
+    assert logs.column("log_index").to_pylist() == ["0x", "0x1", "0x2", "0x10"]
+
+
+def test_cache_is_kept_until_next_load(path):
+    reader = DuckDBReader(path)
+
+    first = reader.controller_logs()
+    assert reader.controller_logs() is first
+
+    load(path, "2", range(10, 15))
+    second = reader.controller_logs()
+    assert second is not first
+    assert second.num_rows == 15
+
+
+def test_writers_are_not_blocked_between_queries(path):
+    reader = DuckDBReader(path)
+    reader.controller_logs()
+
+    # The reader is alive but holds no lock, another process can load
+    subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import duckdb; "
+            f"duckdb.connect({str(path)!r}).execute("
+            "\"INSERT INTO controllers._dlt_loads VALUES ('3', 0)\")",
+        ],
+        check=True,
+    )
+    assert reader.latest_load_id("controllers") == "3"
+
+
+def test_waits_for_writer_in_same_process(path):
+    # A dlt pipeline of this process holds a read-write connection while it loads
+    writer = duckdb.connect(str(path))
+    threading.Timer(0.5, writer.close).start()
+
+    assert DuckDBReader(path, timeout=10).latest_load_id("controllers") == "1"
+
+
+def test_concurrent_queries(path):
+    reader = DuckDBReader(path, pool_size=2)
+    with ThreadPoolExecutor(8) as executor:
+        rows = list(
+            executor.map(
+                lambda block: reader.controller_logs(from_block=block).num_rows,
+                range(8),
+            )
+        )
+    assert rows == [10 - block for block in range(8)]
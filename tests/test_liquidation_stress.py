@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+import pytest
+from defi_ds.data.transform.curve_debt import borrower_positions
+from defi_ds.risk_score import LiquidationStress
+
+
+def user_state(collateral, debt, n1, n2, liquidation_discount):
+    """UserState event data, amounts in token units."""
+    words = [
+        int(collateral * 1e18),
+        int(debt * 1e18),
+        n1 % 2**256,
+        n2 % 2**256,
+        int(liquidation_discount * 1e18),
+    ]
+    return "0x" + "".join(f"{word:064x}" for word in words)
+
+
+def test_borrower_positions_keeps_latest_state_by_log_position():
+    # Logs concatenated from two loads repeat index labels
+    df = pd.concat(
+        [
+            pd.DataFrame(
+                {
+                    "user": ["a", "b"],
+                    "block_number": ["0x10", "0x10"],
+                    "log_index": ["0x1", "0x"],
+                    "data": [
+                        user_state(1, 500, 5, 14, 0.05),
+                        user_state(3, 0, 0, 0, 0),
+                    ],
+                }
+            ),
+            pd.DataFrame(
+                {
+                    "user": ["a"],
+                    "block_number": ["0x10"],
+                    "log_index": ["0x"],
+                    "data": [user_state(2, 600, 4, 13, 0.05)],
+                }
+            ),
+        ]
+    )
+
+    positions = borrower_positions(df)
+
+    # b repaid, a's latest state is log 1 of block 16
+    assert positions.to_dict("records") == [
+        {
+            "user": "a",
+            "collateral": 1.0,
+            "debt": 500.0,
+            "n1": 5,
+            "n2": 14,
+            "liquidation_discount": 0.05,
+        }
+    ]
+
+
+def test_stress_test_thresholds():
+    # Bands 20 to 29: soft liquidation below 3000 * 0.99 ** 20 = 2453.8, fully converted below
+    # 3000 * 0.99 ** 30 = 2219.2, where the bands hold 2334.0 crvUSD per collateral at their
+    # mid prices, 2100.6 after a 10% soft liquidation loss
+    df = pd.DataFrame(
+        {
+            "collateral": [1.0, 1.0],
+            "debt": [1500.0, 2050.0],
+            "n1": [20, 20],
+            "n2": [29, 29],
+            "liquidation_discount": [0.05, 0.05],
+        }
+    )
+    stress = LiquidationStress(
+        df, price=3000, base_price=3000, soft_liquidation_loss=0.1
+    )
+
+    result = stress.stress_test([0.0, -0.2, -0.3, -0.5])
+
+    np.testing.assert_allclose(result["price"], [3000, 2400, 2100, 1500])
+    assert result["users_in_soft_liquidation"].tolist() == [0, 2, 2, 2]
+    assert result["users_fully_converted"].tolist() == [0, 0, 2, 2]
+    # 2400 is 2.2 bands below the top of 10 bands
+    np.testing.assert_allclose(
+        result["collateral_converted"],
+        [0, 2 * np.log(2400 / (3000 * 0.99**20)) / np.log(0.99) / 10, 2, 2],
+        rtol=1e-3,
+    )
+    # 2100.6 * 0.95 = 1995.6 < 2050 once converted, the 1500 debt stays healthy at any price
+    assert result["users_liquidatable"].tolist() == [0, 0, 1, 1]
+    assert result["debt_liquidatable"].tolist() == [0, 0, 2050, 2050]
+
+
+def test_converted_bands_keep_their_value():
+    df = pd.DataFrame(
+        {
+            "collateral": [1.0],
+            "debt": [1500.0],
+            "n1": [20],
+            "n2": [29],
+            "liquidation_discount": [0.0],
+        }
+    )
+    stress = LiquidationStress(df, price=3000, base_price=3000)
+
+    result = stress.stress_test(-np.arange(0, 91) / 100)
+
+    assert result["users_liquidatable"].sum() == 0
+
+
+def test_stress_test_chunks_match():
+    rng = np.random.default_rng(0)
+    n1 = rng.integers(0, 60, 500)
+    df = pd.DataFrame(
+        {
+            "collateral": rng.uniform(0.1, 10, 500),
+            "debt": rng.uniform(100, 20000, 500),
+            "n1": n1,
+            "n2": n1 + rng.integers(3, 50, 500),
+            "liquidation_discount": 0.05,
+        }
+    )
+    stress = LiquidationStress(
+        df, price=3000, base_price=3500, soft_liquidation_loss=0.05
+    )
+    expected = stress.stress_test()
+
+    stress.chunk_size = 1000
+    pd.testing.assert_frame_equal(stress.stress_test(), expected)
@@ -0,0 +1,102 @@
+import pytest
+from defi_ds.data.source import rpc_logs
+from defi_ds.data.source.rpc import RPCError
+
+from rpc_stub import StubRPCServer, make_logs
+
+ADDRESS = "0x8472a9a7632b173c8cf3a86d3afec50c35548e76"
+LATEST_BLOCK = 5000
+ETHERSCAN_FIELDS = [
+    "address",
+    "topics",
+    "data",
+    "blockNumber",
+    "blockHash",
+    "timeStamp",
+    "gasPrice",
+    "gasUsed",
+    "logIndex",
+    "transactionHash",
+    "transactionIndex",
+]
+
+
+def fetch(server, **kwargs):
+    return list(rpc_logs(address=ADDRESS, rpc_url=server.url, **kwargs))
+
+
+def test_logs_match_etherscan_schema_and_order():
+    logs = make_logs(ADDRESS, LATEST_BLOCK)
+    with StubRPCServer(logs, LATEST_BLOCK) as server:
+        records = fetch(server, block_range=500, batch_size=5, max_connections=3)
+
+    assert len(records) == len(logs)
+    assert all(list(record) == ETHERSCAN_FIELDS for record in records)
+    positions = [
+        (int(record["blockNumber"], 16), int(record["logIndex"], 16))
+        for record in records
+    ]
+    assert positions == sorted(positions)
+    assert records[0]["timeStamp"] == hex(1_700_000_000)
+    assert records[0]["gasUsed"] == "0x5208"
+
+
+def test_block_range_shrinks_on_result_limit():
+    logs = make_logs(ADDRESS, LATEST_BLOCK)
+    with StubRPCServer(logs, LATEST_BLOCK, max_results=50) as server:
+        records = fetch(server, block_range=5000, include_gas=False)
+
+    assert len(records) == len(logs)
+
+
+def test_other_errors_are_raised_without_bisecting():
+    error = {"code": -32000, "message": "invalid address"}
+    with StubRPCServer([], LATEST_BLOCK, error=error) as server:
+        with pytest.raises(Exception, match="invalid address"):
+            fetch(server, block_range=100, batch_size=10, max_connections=2)
+
+    assert server.calls["eth_getLogs"] <= 20
+
+
+def test_batch_size_shrinks_when_batch_is_rejected():
+    logs = make_logs(ADDRESS, LATEST_BLOCK)
+    with StubRPCServer(logs, LATEST_BLOCK, max_batch_size=4) as server:
+        records = fetch(server, block_range=200, batch_size=20)
+
+    assert len(records) == len(logs)
+
+
+def rpc_error(excinfo):
+    # dlt wraps errors raised in resources
+    error = excinfo.value
+    while not isinstance(error, RPCError) and error.__cause__ is not None:
+        error = error.__cause__
+    assert isinstance(error, RPCError)
+    return error
+
+
+def test_missing_response_is_an_rpc_error():
+    with StubRPCServer([], LATEST_BLOCK, drop_ids=True) as server:
+        with pytest.raises(Exception) as excinfo:
+            fetch(server, toBlock=100)
+
+    rpc_error(excinfo)
+
+
+def test_missing_receipt_is_an_rpc_error():
+    logs = make_logs(ADDRESS, LATEST_BLOCK)
+    with StubRPCServer(logs, LATEST_BLOCK, null_receipts=True) as server:
+        with pytest.raises(Exception) as excinfo:
+            fetch(server, toBlock=100)
+
+    assert "no receipt" in rpc_error(excinfo).message
+
+
+def test_block_number_error_is_raised():
+    error = {"code": -32603, "message": "internal error"}
+    method_errors = {"eth_blockNumber": error}
+    with StubRPCServer([], LATEST_BLOCK, method_errors=method_errors) as server:
+        with pytest.raises(Exception) as excinfo:
+            fetch(server)
+
+    assert rpc_error(excinfo).code == -32603